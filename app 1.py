@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 import altair as alt
 from datetime import datetime
+from string import Template
 
 st.set_page_config(page_title="NEXYRA Energy Advisor", page_icon="⚡️", layout="wide")
 
@@ -11,14 +12,15 @@ PRIMARY = "#00B4B6"   # Electric Teal
 SILVER  = "#A7A9AC"   # Carbon Silver
 BLACK   = "#212121"   # Graphite Black
 
-st.markdown(f"""
+_BRAND_CSS = f"""
 <style>
 .small-note {{ color:{BLACK}; opacity:0.75; font-size:0.9rem; }}
 .headerline {{ border-bottom: 3px solid {PRIMARY}; margin: 0.25rem 0 1rem 0; }}
 .card {{ background: white; border:1px solid {SILVER}33; border-radius:12px; padding:16px; }}
 .help {{ color:{BLACK}; opacity:0.7; font-size:0.85rem; }}
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_BRAND_CSS, unsafe_allow_html=True)
 
 # ---------- HELPERS ----------
 REGION_IRRADIANCE = {
@@ -28,6 +30,29 @@ REGION_IRRADIANCE = {
     "Custom": None,
 }
 
+# Styler format spec for the residential results table
+FMT_RES = {
+    "PV_kWp": "{:.1f}",
+    "Battery_kWh": "{:.1f}",
+    "PV_Generation_kWh": "{:,.0f}",
+    "Self_Consumed_kWh": "{:,.0f}",
+    "Exported_kWh": "{:,.0f}",
+    "Post_Import_kWh": "{:,.0f}",
+    "Annual_Bill_GBP": "£{:,.0f}",
+    "Savings_vs_Baseline_GBP": "£{:,.0f}",
+    "Export_Income_GBP": "£{:,.0f}",
+    "CO2_Savings_t_per_yr": "{:.2f}",
+    "Installed_Cost_GBP": "£{:,.0f}",
+    "Simple_Payback_years": "{:.1f}"
+}
+
+# Chart panels: source column -> panel title
+CHART_METRICS = {
+    "Savings_vs_Baseline_GBP": "Annual Savings (£)",
+    "Simple_Payback_years": "Simple Payback (years)",
+}
+CHART_PANEL_WIDTH = 440  # px per facet; fixed, since facet charts ignore use_container_width
+
 def clamp(v, lo, hi):
     return max(lo, min(hi, v))
 
@@ -38,39 +63,41 @@ def compute_residential(annual_use_kwh, unit_rate, standing, seg_rate,
                         cost_bronze, cost_silver, cost_gold,
                         grid_co2=0.20, export_credit=0.5):
     """Return DataFrame of Bronze/Silver/Gold results for residential scenario."""
-    presets = [
-        ("Bronze", 3.6, 5.0, sc_bronze, cost_bronze, False, False),
-        ("Silver", 4.0, 9.5, sc_silver, cost_silver, True,  False),
-        ("Gold",   6.0, 13.0, sc_gold,  cost_gold,  True,  True),
-    ]
-    rows = []
-    baseline_bill = (annual_use_kwh + ev_kwh + hp_kwh) * unit_rate + 365 * standing
-    for tier, pv_kwp, batt_kwh, sc_rate, cost, has_ev, has_ems in presets:
-        pv_gen = pv_kwp * irradiance
-        self_used = pv_gen * sc_rate
-        exported = max(pv_gen - self_used, 0)
-        post_import = max((annual_use_kwh + ev_kwh + hp_kwh) - self_used, 0)
-        new_bill = max(post_import * unit_rate + 365 * standing - exported * seg_rate, 0)  # clamp >=0
-        savings = max(baseline_bill - new_bill, 0)  # clamp >=0
-        export_income = exported * seg_rate
-        co2_t = (self_used * grid_co2 + exported * grid_co2 * export_credit) / 1000.0
-        payback = (cost / savings) if savings > 0 else np.nan
-        rows.append(dict(
-            Tier=tier,
-            PV_kWp=pv_kwp,
-            Battery_kWh=batt_kwh,
-            PV_Generation_kWh=pv_gen,
-            Self_Consumed_kWh=self_used,
-            Exported_kWh=exported,
-            Post_Import_kWh=post_import,
-            Annual_Bill_GBP=new_bill,
-            Savings_vs_Baseline_GBP=savings,
-            Export_Income_GBP=export_income,
-            CO2_Savings_t_per_yr=co2_t,
-            Installed_Cost_GBP=cost,
-            Simple_Payback_years=payback
-        ))
-    df = pd.DataFrame(rows)
+    tiers = ["Bronze", "Silver", "Gold"]
+    pv_kwp = np.array([3.6, 4.0, 6.0])
+    batt_kwh = np.array([5.0, 9.5, 13.0])
+    sc_rate = np.array([sc_bronze, sc_silver, sc_gold], dtype=float)
+    cost = np.array([cost_bronze, cost_silver, cost_gold])
+
+    total_use = annual_use_kwh + ev_kwh + hp_kwh
+    baseline_bill = total_use * unit_rate + 365 * standing
+    # All three tiers at once (elementwise over the tier arrays)
+    pv_gen = pv_kwp * irradiance
+    self_used = pv_gen * sc_rate
+    exported = np.maximum(pv_gen - self_used, 0.0)
+    post_import = np.maximum(total_use - self_used, 0.0)
+    new_bill = np.maximum(post_import * unit_rate + 365 * standing - exported * seg_rate, 0.0)  # clamp >=0
+    savings = np.maximum(baseline_bill - new_bill, 0.0)  # clamp >=0
+    export_income = exported * seg_rate
+    co2_t = (self_used * grid_co2 + exported * grid_co2 * export_credit) / 1000.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payback = np.where(savings > 0, cost / savings, np.nan)
+
+    df = pd.DataFrame({
+        "Tier": tiers,
+        "PV_kWp": pv_kwp,
+        "Battery_kWh": batt_kwh,
+        "PV_Generation_kWh": pv_gen,
+        "Self_Consumed_kWh": self_used,
+        "Exported_kWh": exported,
+        "Post_Import_kWh": post_import,
+        "Annual_Bill_GBP": new_bill,
+        "Savings_vs_Baseline_GBP": savings,
+        "Export_Income_GBP": export_income,
+        "CO2_Savings_t_per_yr": co2_t,
+        "Installed_Cost_GBP": cost,
+        "Simple_Payback_years": payback,
+    })
     return df, baseline_bill
 
 def compute_simple(pv_kwp, battery_kwh, sc_rate, installed_cost, irradiance, unit_rate, seg_rate):
@@ -91,6 +118,47 @@ def compute_simple(pv_kwp, battery_kwh, sc_rate, installed_cost, irradiance, uni
         Simple_Payback_years=payback
     )
 
+# Static snapshot page; only the table rows and timestamp are filled in per download
+_SNAPSHOT_SHELL = Template(f"""
+    <html><head>
+    <meta charset="utf-8">
+    <title>NEXYRA – Snapshot</title>
+    <style>
+        body {{ font-family: Inter, system-ui, -apple-system, Segoe UI, Roboto, Arial; color: {BLACK}; }}
+        table {{ border-collapse: collapse; width: 100%; }}
+        th, td {{ border: 1px solid #e0e0e0; padding: 8px 10px; text-align:center; }}
+        th {{ background: {PRIMARY}; color: white; }}
+        h1 {{ margin: 0; padding: 0.5rem 0; }}
+        .note {{ color: #666; font-size: 0.9rem; }}
+    </style>
+    </head><body>
+    <h1>NEXYRA – Residential Snapshot</h1>
+    <p class="note">Generated $ts · Assumptions set in the app.</p>
+    <table>
+        <tr><th>Tier</th><th>Annual Bill (£)</th><th>Savings (£)</th><th>Export Income (£)</th><th>CO₂ Savings (t/yr)</th><th>Installed Cost (£)</th><th>Payback (yrs)</th></tr>
+        $rows
+    </table>
+    </body></html>
+    """)
+
+def _snapshot_rows(df):
+    """Return the snapshot table rows for the residential results."""
+    return "".join(f"""
+            <tr>
+              <td>{r.Tier}</td>
+              <td>£{r.Annual_Bill_GBP:,.0f}</td>
+              <td>£{r.Savings_vs_Baseline_GBP:,.0f}</td>
+              <td>£{r.Export_Income_GBP:,.0f}</td>
+              <td>{r.CO2_Savings_t_per_yr:.2f} t</td>
+              <td>£{r.Installed_Cost_GBP:,.0f}</td>
+              <td>{r.Simple_Payback_years:.1f}</td>
+            </tr>
+        """ for r in df.itertuples(index=False))
+
+def _snapshot_html(df, generated: str) -> bytes:
+    """Return the residential HTML snapshot as bytes (`generated` is the header timestamp)."""
+    return _SNAPSHOT_SHELL.substitute(rows=_snapshot_rows(df), ts=generated).encode("utf-8")
+
 # ---------- UI ----------
 st.title("⚡️ NEXYRA Energy Advisor")
 st.markdown('<div class="headerline"></div>', unsafe_allow_html=True)
@@ -178,84 +246,34 @@ df_res, baseline = compute_residential(
 )
 
 # ---------- OUTPUT ----------
+bills = dict(zip(df_res["Tier"].tolist(), df_res["Annual_Bill_GBP"].tolist()))
 k1, k2, k3, k4 = st.columns(4)
 k1.metric("Baseline annual bill", f"£{baseline:,.0f}")
-k2.metric("Bronze bill", f"£{df_res.loc[df_res.Tier=='Bronze','Annual_Bill_GBP'].values[0]:,.0f}")
-k3.metric("Silver bill", f"£{df_res.loc[df_res.Tier=='Silver','Annual_Bill_GBP'].values[0]:,.0f}")
-k4.metric("Gold bill", f"£{df_res.loc[df_res.Tier=='Gold','Annual_Bill_GBP'].values[0]:,.0f}")
+k2.metric("Bronze bill", f"£{bills['Bronze']:,.0f}")
+k3.metric("Silver bill", f"£{bills['Silver']:,.0f}")
+k4.metric("Gold bill", f"£{bills['Gold']:,.0f}")
 
 st.markdown("### Results")
-st.dataframe(df_res.style.format({
-    "PV_kWp": "{:.1f}",
-    "Battery_kWh": "{:.1f}",
-    "PV_Generation_kWh": "{:,.0f}",
-    "Self_Consumed_kWh": "{:,.0f}",
-    "Exported_KWh": "{:,.0f}",
-    "Post_Import_kWh": "{:,.0f}",
-    "Annual_Bill_GBP": "£{:,.0f}",
-    "Savings_vs_Baseline_GBP": "£{:,.0f}",
-    "Export_Income_GBP": "£{:,.0f}",
-    "CO2_Savings_t_per_yr": "{:.2f}",
-    "Installed_Cost_GBP": "£{:,.0f}",
-    "Simple_Payback_years": "{:.1f}"
-}), use_container_width=True)
+st.dataframe(df_res.style.format(FMT_RES), use_container_width=True)
 
 st.markdown("### Charts")
-chart1 = alt.Chart(df_res).mark_bar(color=PRIMARY).encode(
-    x=alt.X("Tier:N", sort=["Bronze","Silver","Gold"]),
-    y=alt.Y("Savings_vs_Baseline_GBP:Q", title="Annual Savings (£)")
-).properties(height=300)
-chart2 = alt.Chart(df_res).mark_bar(color=SILVER).encode(
+long = df_res.melt(id_vars="Tier", value_vars=list(CHART_METRICS),
+                   var_name="Metric", value_name="Value")
+long["Metric"] = long["Metric"].map(CHART_METRICS)
+chart = alt.Chart(long).mark_bar().encode(
     x=alt.X("Tier:N", sort=["Bronze","Silver","Gold"]),
-    y=alt.Y("Simple_Payback_years:Q", title="Simple Payback (years)")
-).properties(height=300)
-c1, c2 = st.columns(2)
-c1.altair_chart(chart1, use_container_width=True)
-c2.altair_chart(chart2, use_container_width=True)
+    y=alt.Y("Value:Q", title=None),
+    color=alt.Color("Metric:N", scale=alt.Scale(domain=list(CHART_METRICS.values()), range=[PRIMARY, SILVER]), legend=None)
+).properties(height=300, width=CHART_PANEL_WIDTH).facet(
+    column=alt.Column("Metric:N", sort=list(CHART_METRICS.values()), title=None)
+).resolve_scale(y="independent")
+st.altair_chart(chart)
 
 st.markdown("### Download")
 csv = df_res.to_csv(index=False).encode("utf-8")
 st.download_button("Download Results (CSV)", data=csv, file_name="nexyra_residential_results.csv", mime="text/csv")
 
-def snapshot_html():
-    rows = []
-    for _, r in df_res.iterrows():
-        rows.append(f"""
-            <tr>
-              <td>{r['Tier']}</td>
-              <td>£{r['Annual_Bill_GBP']:,.0f}</td>
-              <td>£{r['Savings_vs_Baseline_GBP']:,.0f}</td>
-              <td>£{r['Export_Income_GBP']:,.0f}</td>
-              <td>{r['CO2_Savings_t_per_yr']:.2f} t</td>
-              <td>£{r['Installed_Cost_GBP']:,.0f}</td>
-              <td>{r['Simple_Payback_years']:.1f}</td>
-            </tr>
-        """)
-    table_rows = "\n".join(rows)
-    html = f"""
-    <html><head>
-    <meta charset="utf-8">
-    <title>NEXYRA – Snapshot</title>
-    <style>
-        body {{ font-family: Inter, system-ui, -apple-system, Segoe UI, Roboto, Arial; color: {BLACK}; }}
-        table {{ border-collapse: collapse; width: 100%; }}
-        th, td {{ border: 1px solid #e0e0e0; padding: 8px 10px; text-align:center; }}
-        th {{ background: {PRIMARY}; color: white; }}
-        h1 {{ margin: 0; padding: 0.5rem 0; }}
-        .note {{ color: #666; font-size: 0.9rem; }}
-    </style>
-    </head><body>
-    <h1>NEXYRA – Residential Snapshot</h1>
-    <p class="note">Generated {datetime.now().strftime("%Y-%m-%d %H:%M")} · Assumptions set in the app.</p>
-    <table>
-        <tr><th>Tier</th><th>Annual Bill (£)</th><th>Savings (£)</th><th>Export Income (£)</th><th>CO₂ Savings (t/yr)</th><th>Installed Cost (£)</th><th>Payback (yrs)</th></tr>
-        {table_rows}
-    </table>
-    </body></html>
-    """
-    return html
-
-html_bytes = snapshot_html().encode("utf-8")
+html_bytes = _snapshot_html(df_res, datetime.now().strftime("%Y-%m-%d %H:%M"))
 st.download_button("Download Snapshot (HTML)", data=html_bytes, file_name="nexyra_snapshot.html", mime="text/html")
 st.caption("Tip: open the HTML and use your browser's Print → Save as PDF.")
 